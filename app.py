@@ -1,14 +1,45 @@
+import gzip
+import hashlib
 import math
+import os
 
-from flask import Flask, jsonify, redirect, render_template, request, g, url_for
+from flask import Flask, Response, abort, jsonify, redirect, render_template, request, g, url_for
+from jinja2 import FileSystemBytecodeCache
+
+import feeds
+import serializers
+from fragment_cache import FragmentCacheExtension
 
 from data_access.db_bootstrap import ContentBlock
-from models.article import Article
-from services import get_service, USE_MOCK_DATA
+from models.article import (
+    ARTICLE_API_FIELDS, DETAIL_API_FIELDS, SUMMARY_API_FIELDS, Article, month_range,
+    parse_date_created
+)
+from rendering import RENDERER_VERSION
+from services import get_service, maintenance, migrate_database, read_flight, USE_MOCK_DATA
 
 
 app = Flask(__name__)
 
+# Compiled templates are shared on disk, so only the first worker to boot compiles them
+TEMPLATE_CACHE_DIR = os.environ.get(
+    'TEMPLATE_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'jinja')
+)
+os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache(TEMPLATE_CACHE_DIR)
+app.jinja_env.add_extension(FragmentCacheExtension)
+
+# Canonical origin for absolute URLs in feeds and sitemaps; never taken from the Host header
+SITE_URL = os.environ.get('SITE_URL') or (
+    f"{app.config['PREFERRED_URL_SCHEME']}://{app.config['SERVER_NAME']}" if app.config.get('SERVER_NAME')
+    else None
+)
+if SITE_URL is None:
+    SITE_URL = 'http://127.0.0.1:5123'
+    if not USE_MOCK_DATA:
+        print(f"[FEEDS] WARNING: SITE_URL is not set; feed and sitemap links will point at {SITE_URL}")
+SITE_URL = SITE_URL.rstrip('/') + '/'
+
 
 # ---------------------------------------------------------
 # WEB ROUTES (HTML Views)
@@ -51,12 +82,44 @@ def home_page():
     )
 
 
+@app.route('/archive/<int:year>/<int:month>')
+def archive_page(year, month):
+    # month_range needs datetime(year + 1, ...) to exist, so 9998 is the last valid year
+    if not 1 <= year <= 9998 or not 1 <= month <= 12:
+        return redirect(url_for('home_page'))
+
+    service = get_service()
+
+    page = request.args.get('page', 1, type=int)
+    page = page if page > 0 else 1
+    POST_PER_PAGE = 6
+
+    offset = (page - 1) * POST_PER_PAGE
+
+    # Half-open month range so the query stays a plain range scan on published_at
+    start, end = month_range(year, month)
+    summaries = service.get_summaries_between(start, end, POST_PER_PAGE, offset)
+    total_count = service.get_count_between(start, end)
+
+    total_pages = math.ceil(total_count / POST_PER_PAGE) if total_count > 0 else 1
+
+    return render_template(
+        'home.html',
+        summaries=summaries,
+        page=page,
+        total_pages=total_pages,
+        has_next=page < total_pages,
+        has_prev=page > 1,
+        archive_label=start.strftime('%B %Y')
+    )
+
+
 @app.route('/article/<int:id>')
 def article_page(id):
     service = get_service()
     
-    # Use the service to get data
-    article = service.get_article(id)
+    # Use the service to get data (body is pre-rendered at write time)
+    article = service.get_rendered_article(id)
     
     if not article:
         # Assuming you might want a 404 page, or just return text
@@ -71,10 +134,140 @@ def article_page(id):
     )
 
 
+def current_content_version():
+    """Content version for this request, looked up at most once."""
+    if 'content_version' not in g:
+        g.content_version = get_service().get_content_version()
+    return g.content_version
+
+
+def get_archive_counts():
+    """Precomputed per-month counts; only called when the archive fragment is re-rendered."""
+    return get_service().get_archive_counts()
+
+
+app.jinja_env.fragment_cache_version = current_content_version
+app.jinja_env.globals['get_archive_counts'] = get_archive_counts
+
+
+# ---------------------------------------------------------
+# FEEDS (Cached XML)
+# ---------------------------------------------------------
+
+def precompressed_response(cached: feeds.CachedBody, mimetype: str) -> Response:
+    """Serves a cached gzip body, answering 304 when the client's ETag is current."""
+    if 'gzip' in request.accept_encodings:
+        response = Response(cached.gzip_body, mimetype=mimetype)
+        response.headers['Content-Encoding'] = 'gzip'
+        etag = f"{cached.etag}-gz"
+    else:
+        response = Response(gzip.decompress(cached.gzip_body), mimetype=mimetype)
+        etag = cached.etag
+
+    response.vary.add('Accept-Encoding')
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.no_cache = True  # Always revalidate; the ETag makes that cheap
+    return response.make_conditional(request)
+
+
+@app.route('/feed.xml')
+def atom_feed():
+    cached = feeds.get_feed(get_service(), SITE_URL)
+    return precompressed_response(cached, 'application/atom+xml')
+
+
+@app.route('/sitemap.xml')
+def sitemap():
+    cached = feeds.get_sitemap(get_service(), SITE_URL)
+    return precompressed_response(cached, 'application/xml')
+
+
+@app.route('/sitemap-<int:shard>.xml')
+def sitemap_shard(shard):
+    cached = feeds.get_sitemap(get_service(), SITE_URL, shard)
+    if cached is None:
+        abort(404)
+    return precompressed_response(cached, 'application/xml')
+
+
 # ---------------------------------------------------------
 # API ROUTES (JSON Data)
 # ---------------------------------------------------------
 
+API_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 100
+
+
+def parse_fields(default):
+    """Reads ?fields=a,b,c (order kept, duplicates dropped); raises ValueError on unknown names."""
+    raw = request.args.get('fields')
+    if not raw:
+        return list(default)
+
+    fields = list(dict.fromkeys(f.strip() for f in raw.split(',') if f.strip()))
+    unknown = [f for f in fields if f not in ARTICLE_API_FIELDS]
+    if unknown or not fields:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown) or raw}")
+    return fields
+
+
+def conditional_json(etag_key: tuple, build):
+    """
+    Answers If-None-Match from the content version alone, before touching the
+    articles table; otherwise encodes build() and tags it with the same ETag.
+    """
+    version = get_service().get_content_version()
+    digest = hashlib.sha1(repr(etag_key).encode('utf-8')).hexdigest()[:16]
+    etag = f"v{version}-r{RENDERER_VERSION}-{digest}"
+
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        payload = build()
+        if payload is None:
+            return jsonify({"error": "Article not found"}), 404
+        response = Response(serializers.dumps(payload), mimetype='application/json')
+
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response
+
+
+@app.route('/api/articles', methods=['GET'])
+def list_articles():
+    try:
+        fields = parse_fields(SUMMARY_API_FIELDS)
+        limit = min(max(request.args.get('limit', API_PAGE_SIZE, type=int), 1), API_MAX_PAGE_SIZE)
+        cursor = request.args.get('cursor') or None
+
+        def build():
+            items, next_cursor = get_service().get_summary_page(fields, limit, cursor)
+            return {"items": items, "next_cursor": next_cursor}
+
+        return conditional_json(('list', tuple(fields), limit, cursor), build)
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/api/articles/<int:id>', methods=['GET'])
+def get_article_json(id):
+    try:
+        fields = parse_fields(DETAIL_API_FIELDS)
+        return conditional_json(
+            ('article', id, tuple(fields)),
+            lambda: get_service().get_article_fields(id, fields)
+        )
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @app.route('/api/articles', methods=['POST'])
 def create_article():
     data = request.get_json()
@@ -83,6 +276,10 @@ def create_article():
     if not data:
         return jsonify({"error": "No data provided"}), 400
 
+    # published_at and the archive are derived from date_created, so it must parse
+    if 'date_created' in data and parse_date_created(data['date_created']) is None:
+        return jsonify({"error": "Invalid date_created: expected e.g. 'January 10, 2026' or '2026-01-10'"}), 400
+
     try:
         # Convert raw JSON "content_blocks" to ContentBlock objects
         blocks = [ContentBlock(**b) for b in data.get('content_blocks', [])]
@@ -127,6 +324,21 @@ def delete_article(id):
         return jsonify({"error": str(e)}), 500
 
 
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """
+    Per-worker counters; read coalescing shows how many DB calls were collapsed.
+    Database sizes come from the maintenance leader's last checkpoint (null elsewhere).
+    """
+    maintenance_stats = maintenance.snapshot()
+    return jsonify({
+        "singleflight": read_flight.snapshot(),
+        "fragment_cache": dict(app.jinja_env.fragment_cache.stats),
+        "database": maintenance_stats.pop("database_stats"),
+        "maintenance": maintenance_stats,
+    }), 200
+
+
 # ---------------------------------------------------------ARN1exr@mhj6zkq6tgz
 # APP LIFECYCLE
 # ---------------------------------------------------------
@@ -141,6 +353,26 @@ def close_connection(exception):
     if dao is not None:
         dao.con.close()
 
+    # Release the shared gate only after the connection is closed
+    lease = g.pop('db_lease', None)
+    if lease is not None:
+        lease.close()
+
+
+def warm_template_cache():
+    """Loads every template at boot; with the bytecode cache this skips compilation after the first worker."""
+    for name in app.jinja_env.list_templates(extensions=['html']):
+        app.jinja_env.get_template(name)
+
+
+warm_template_cache()
+
+# Schema migrations run here once; per-request connections skip them.
+# Checkpointing/compaction: only the worker that wins the leader lock does any work
+if not USE_MOCK_DATA:
+    migrate_database()
+    maintenance.start()
+
 
 if __name__ == '__main__':
     print(f"--- APP STARTING (MOCK DATA: {USE_MOCK_DATA}) ---")
@@ -0,0 +1,77 @@
+"""
+Measures per-route render time and the template-loading part of worker startup.
+
+    python bench_render.py [--requests 200]
+
+Run with the default USE_MOCK_DATA=True to isolate template rendering from the
+per-request DuckDB connection cost.
+
+Startup is measured in fresh interpreters, first with an empty template
+bytecode cache (first worker to boot) and then with a warm one (later workers).
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+ROUTES = ['/home', '/home?page=2', '/archive/2026/2', '/article/101', '/feed.xml']
+
+# Third-party and service imports are excluded so the timing covers app setup and template loading
+STARTUP_SNIPPET = """
+import time
+import duckdb, flask, jinja2, services
+t0 = time.perf_counter()
+import app
+env = app.app.jinja_env
+for name in env.list_templates(extensions=['html']):
+    env.get_template(name)
+print(time.perf_counter() - t0)
+"""
+
+
+def bench_routes(n: int):
+    import app as blog
+
+    client = blog.app.test_client()
+    print(f"\n--- RENDER TIME PER ROUTE ({n} requests, ms) ---")
+    for route in ROUTES:
+        client.get(route)  # warm-up
+        samples = []
+        for _ in range(n):
+            t0 = time.perf_counter()
+            client.get(route)
+            samples.append((time.perf_counter() - t0) * 1000)
+        print(f"{route:<20} mean={statistics.mean(samples):7.3f}  p50={statistics.median(samples):7.3f}")
+
+
+def bench_startup(runs: int):
+    cache_dir = os.environ.get(
+        'TEMPLATE_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'jinja')
+    )
+
+    def boot() -> float:
+        out = subprocess.run([sys.executable, '-c', STARTUP_SNIPPET], capture_output=True, text=True, check=True)
+        return float(out.stdout.strip().splitlines()[-1]) * 1000
+
+    cold = []
+    for _ in range(runs):
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        cold.append(boot())
+    warm = [boot() for _ in range(runs)]
+
+    print(f"\n--- WORKER STARTUP: TEMPLATE LOAD ({runs} runs, ms) ---")
+    print(f"empty bytecode cache  mean={statistics.mean(cold):7.2f}")
+    print(f"warm bytecode cache   mean={statistics.mean(warm):7.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--startup-runs", type=int, default=5)
+    args = parser.parse_args()
+
+    bench_startup(args.startup_runs)
+    bench_routes(args.requests)
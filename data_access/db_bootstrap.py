@@ -1,7 +1,15 @@
 import duckdb
 from dataclasses import dataclass, field, asdict
+from datetime import datetime
 from typing import List, Optional
 
+from models.article import DATE_CREATED_FORMATS, month_range
+
+# SQL expression that parses the legacy `date_created` strings into a TIMESTAMP
+PARSE_DATE_CREATED_SQL = "COALESCE({})".format(
+    ", ".join(f"try_strptime(date_created, '{fmt}')" for fmt in DATE_CREATED_FORMATS)
+)
+
 # --- Dataclasses (Re-imported here to ensure script is standalone-ish) ---
 @dataclass
 class ContentBlock:
@@ -30,10 +38,51 @@ class Comment:
 class CommentThread:
     comments: List[Comment]
 
+COMMENTS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY DEFAULT nextval('seq_comment_id'),
+        article_id INTEGER,
+        parent_id INTEGER,
+        author_name VARCHAR,
+        text VARCHAR,
+        avatar_url VARCHAR
+    );
+"""
+
+def rebuild_archive_counts(con: duckdb.DuckDBPyConnection):
+    """Recomputes the per-month article counts from `articles.published_at`."""
+    con.execute("DELETE FROM article_archive")
+    con.execute("""
+        INSERT INTO article_archive (year, month, article_count)
+        SELECT year(published_at), month(published_at), COUNT(*)
+        FROM articles
+        WHERE published_at IS NOT NULL
+        GROUP BY 1, 2
+    """)
+
+def refresh_archive_month(con: duckdb.DuckDBPyConnection, published_at: Optional[datetime]):
+    """Recounts the one archive month a written article belongs to (a zone-map range scan)."""
+    if published_at is None:
+        return
+    start, end = month_range(published_at.year, published_at.month)
+    con.execute("DELETE FROM article_archive WHERE year = ? AND month = ?", (start.year, start.month))
+    con.execute("""
+        INSERT INTO article_archive (year, month, article_count)
+        SELECT ?, ?, COUNT(*)
+        FROM articles
+        WHERE published_at >= ? AND published_at < ?
+        HAVING COUNT(*) > 0
+    """, (start.year, start.month, start, end))
+
 class BlogRepository:
-    def __init__(self, db_path=':memory:'):
+    def __init__(self, db_path=':memory:', migrate: bool = True):
+        """
+        migrate=False skips schema initialization; the app migrates once at
+        boot so per-request connections don't pay for the DDL.
+        """
         self.con = duckdb.connect(db_path)
-        self._init_db()
+        if migrate:
+            self._init_db()
 
     def _init_db(self):
         """Idempotent schema initialization"""
@@ -52,18 +101,108 @@ class BlogRepository:
             );
         """)
         
+        # No FOREIGN KEY on article_id: DuckDB can't delete a referenced row in the
+        # same transaction as its referencing rows, so BlogDAO.delete_article
+        # cascades to comments transactionally instead.
+        self.con.execute(COMMENTS_TABLE_SQL.format(table="comments"))
+        self._migrate_comments_fk()
+
+        # Single-row counter bumped on every content write; derived caches key on it
+        self.con.execute("CREATE TABLE IF NOT EXISTS content_version (version BIGINT);")
         self.con.execute("""
-            CREATE TABLE IF NOT EXISTS comments (
-                id INTEGER PRIMARY KEY DEFAULT nextval('seq_comment_id'),
-                article_id INTEGER,
-                parent_id INTEGER,
-                author_name VARCHAR,
-                text VARCHAR,
-                avatar_url VARCHAR,
-                FOREIGN KEY (article_id) REFERENCES articles(id)
+            INSERT INTO content_version
+            SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM content_version)
+        """)
+
+        # One row per completed one-off data migration
+        self.con.execute("CREATE TABLE IF NOT EXISTS schema_migrations (name VARCHAR PRIMARY KEY);")
+
+        self._migrate_published_at()
+        self._migrate_rendered_columns()
+
+    def _migration_done(self, name: str) -> bool:
+        return self.con.execute(
+            "SELECT COUNT(*) FROM schema_migrations WHERE name = ?", (name,)
+        ).fetchone()[0] > 0
+
+    def _migrate_comments_fk(self):
+        """
+        Rebuilds `comments` without the legacy FOREIGN KEY (DuckDB can't drop constraints in place).
+        """
+        has_fk = self.con.execute("""
+            SELECT COUNT(*) FROM duckdb_constraints()
+            WHERE table_name = 'comments' AND constraint_type = 'FOREIGN KEY'
+        """).fetchone()[0]
+
+        if not has_fk:
+            return
+
+        self.con.execute("BEGIN TRANSACTION")
+        try:
+            self.con.execute(COMMENTS_TABLE_SQL.format(table="comments_migrated"))
+            self.con.execute("""
+                INSERT INTO comments_migrated (id, article_id, parent_id, author_name, text, avatar_url)
+                SELECT id, article_id, parent_id, author_name, text, avatar_url FROM comments
+            """)
+            self.con.execute("DROP TABLE comments")
+            self.con.execute("ALTER TABLE comments_migrated RENAME TO comments")
+            self.con.execute("COMMIT")
+        except Exception:
+            self.con.execute("ROLLBACK")
+            raise
+
+    def _migrate_rendered_columns(self):
+        """
+        Adds the write-time rendering columns. Existing rows stay NULL until
+        `python -m data_access.db_render_utils` renders them.
+        """
+        for column, dtype in [
+            ("body_html", "VARCHAR"),
+            ("toc", "STRUCT(anchor VARCHAR, text VARCHAR)[]"),
+            ("excerpt", "VARCHAR"),
+            ("word_count", "INTEGER"),
+            ("reading_minutes", "INTEGER"),
+            ("renderer_version", "INTEGER"),
+        ]:
+            self.con.execute(f"ALTER TABLE articles ADD COLUMN IF NOT EXISTS {column} {dtype};")
+
+    def _migrate_published_at(self):
+        """
+        Adds the typed `published_at` column and backfills it from `date_created`
+        once; new rows get it from BlogDAO.insert_article. Legacy dates that don't
+        parse stay NULL and are listed last.
+        No ART index is created: DuckDB keeps min/max zone maps per row group, so
+        range filters on `published_at` already skip row groups without a full scan
+        (and an index would block later ALTER TABLE migrations).
+        """
+        self.con.execute("ALTER TABLE articles ADD COLUMN IF NOT EXISTS published_at TIMESTAMP;")
+
+        # Precomputed per-month counts for the sidebar archive widget
+        self.con.execute("""
+            CREATE TABLE IF NOT EXISTS article_archive (
+                year INTEGER,
+                month INTEGER,
+                article_count INTEGER
             );
         """)
 
+        if self._migration_done("published_at_backfill"):
+            return
+
+        self.con.execute("BEGIN TRANSACTION")
+        try:
+            self.con.execute(f"""
+                UPDATE articles
+                SET published_at = {PARSE_DATE_CREATED_SQL}
+                WHERE published_at IS NULL AND date_created IS NOT NULL
+            """)
+            rebuild_archive_counts(self.con)
+            self.con.execute("INSERT INTO schema_migrations VALUES ('published_at_backfill')")
+            self.con.execute("COMMIT")
+        except Exception:
+            self.con.execute("ROLLBACK")
+            raise
+
     def get_article(self, article_id: int) -> Optional[Article]:
         # DuckDB returns STRUCTs as Python dicts
         row = self.con.execute("SELECT * FROM articles WHERE id = ?", (article_id,)).fetchone()
@@ -121,7 +260,10 @@ class BlogRepository:
         return CommentThread(comments=root_comments)
 
 if __name__ == "__main__":
-    from data_access.db_print_utils import pretty_describe_table, pretty_foreign_key
+    from data_access.db_maintenance import database_stats
+    from data_access.db_print_utils import (
+        pretty_database_size, pretty_describe_table, pretty_foreign_key, pretty_table_stats
+    )
 
     repo = BlogRepository("duck.db")
     con = repo.con
@@ -165,6 +307,8 @@ if __name__ == "__main__":
         LIMIT 1
     """).fetchall()
 
+    db_stats = database_stats(con, "duck.db")
+
     # -----------------
     # PRINT PHASE
     # -----------------
@@ -198,4 +342,11 @@ if __name__ == "__main__":
     print("\n--- TYPE VALIDATION ---")
     print(type_rows if type_rows else "No rows to infer types (table empty)")
 
+    print("\n--- DATABASE SIZE ---")
+    print(pretty_database_size(db_stats))
+
+    print("\n--- TABLE SIZES ---")
+    for line in pretty_table_stats(db_stats):
+        print(line)
+
     print("\n--- SCHEMA VALIDATION COMPLETE ---")
\ No newline at end of file
@@ -0,0 +1,366 @@
+import os
+import threading
+import time
+from typing import Optional
+
+import duckdb
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process dev server, no cross-worker locking needed
+    fcntl = None
+
+# --- CONFIGURATION ---
+CHECKPOINT_INTERVAL = int(os.environ.get('DB_CHECKPOINT_INTERVAL', 300))
+COMPACTION_CHECK_INTERVAL = int(os.environ.get('DB_COMPACTION_CHECK_INTERVAL', 3600))
+COMPACTION_THRESHOLD = float(os.environ.get('DB_COMPACTION_THRESHOLD', 0.5))  # free / total blocks
+TICK_SECONDS = 5
+
+
+class DatabaseGate:
+    """
+    Shared/exclusive flock on `<db>.lock`. Requests hold it shared for the life
+    of their connection; compaction takes it exclusively to swap the file.
+    """
+    def __init__(self, db_path: str):
+        self.lock_path = f"{db_path}.lock"
+
+    def shared(self):
+        if fcntl is None:
+            return None
+        lease = open(self.lock_path, 'a')
+        fcntl.flock(lease, fcntl.LOCK_SH)
+        return lease
+
+    def try_exclusive(self, attempts: int = 20, delay: float = 0.25):
+        """Returns an exclusive lease, or None if requests kept the database busy."""
+        if fcntl is None:
+            return None
+        lease = open(self.lock_path, 'a')
+        for _ in range(attempts):
+            try:
+                fcntl.flock(lease, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return lease
+            except BlockingIOError:
+                time.sleep(delay)
+        lease.close()
+        return None
+
+
+# ---------------------------------------------------------
+# STATS
+# ---------------------------------------------------------
+
+def database_stats(con: duckdb.DuckDBPyConnection, db_path: Optional[str] = None) -> dict:
+    """
+    Block usage of the database file plus row counts and on-disk size per table.
+    """
+    block_size, total_blocks, used_blocks, free_blocks = con.execute("""
+        SELECT block_size, total_blocks, used_blocks, free_blocks
+        FROM pragma_database_size()
+        WHERE database_name = current_database()
+    """).fetchone()
+
+    wal_path = f"{db_path}.wal" if db_path else None
+
+    tables = []
+    for (name,) in con.execute("""
+        SELECT table_name FROM duckdb_tables()
+        WHERE database_name = current_database()
+        ORDER BY table_name
+    """).fetchall():
+        rows = con.execute(f'SELECT COUNT(*) FROM "{name}"').fetchone()[0]
+        blocks = con.execute(
+            "SELECT COUNT(DISTINCT block_id) FROM pragma_storage_info(?) WHERE persistent",
+            (name,)
+        ).fetchone()[0]
+        tables.append({"table": name, "rows": rows, "bytes": blocks * block_size})
+
+    return {
+        "file": {
+            "file_bytes": os.path.getsize(db_path) if db_path and os.path.exists(db_path) else 0,
+            "wal_bytes": os.path.getsize(wal_path) if wal_path and os.path.exists(wal_path) else 0,
+            "block_size": block_size,
+            "total_blocks": total_blocks,
+            "used_blocks": used_blocks,
+            "free_blocks": free_blocks,
+            "fragmentation": free_blocks / total_blocks if total_blocks else 0.0,
+        },
+        "tables": tables,
+    }
+
+
+# ---------------------------------------------------------
+# TASKS
+# ---------------------------------------------------------
+
+def checkpoint(db_path: str, gate: DatabaseGate) -> dict:
+    """Flushes the WAL into the database file and returns fresh stats."""
+    lease = gate.shared()
+    try:
+        con = duckdb.connect(db_path)
+        try:
+            con.execute("CHECKPOINT")
+            return database_stats(con, db_path)
+        finally:
+            con.close()
+    finally:
+        if lease is not None:
+            lease.close()
+
+
+def compact(db_path: str, gate: DatabaseGate) -> bool:
+    """
+    Rewrites the database into a fresh file (dropping free blocks) and swaps it
+    in while holding the gate exclusively, so no worker has the old file open.
+    """
+    lease = gate.try_exclusive()
+    if lease is None and fcntl is not None:
+        return False
+
+    tmp_path = f"{db_path}.compact"
+    try:
+        for leftover in (tmp_path, f"{tmp_path}.wal"):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+
+        con = duckdb.connect(db_path)
+        try:
+            con.execute("CHECKPOINT")
+            source = con.execute("SELECT current_database()").fetchone()[0]
+            con.execute("ATTACH '{}' AS compacted".format(tmp_path.replace("'", "''")))
+            con.execute(f'COPY FROM DATABASE "{source}" TO compacted')
+            con.execute("DETACH compacted")
+        finally:
+            con.close()
+
+        # A WAL left behind would be replayed against the new file
+        if os.path.exists(f"{db_path}.wal"):
+            os.remove(tmp_path)
+            return False
+
+        os.replace(tmp_path, db_path)
+        return True
+    finally:
+        if lease is not None:
+            lease.close()
+
+
+# ---------------------------------------------------------
+# SCHEDULER
+# ---------------------------------------------------------
+
+class MaintenanceScheduler:
+    """
+    Background thread that checkpoints and compacts the database.
+    Every worker starts one, but only the worker holding the leader lock runs
+    tasks; if the leader exits, another worker takes over on its next tick.
+    """
+    def __init__(self, db_path: str, gate: DatabaseGate):
+        self.db_path = db_path
+        self.gate = gate
+        self._leader_lock = None
+        self._thread = None
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            "is_leader": False,
+            "checkpoints": 0,
+            "compactions": 0,
+            "compactions_skipped": 0,
+            "failures": 0,
+            "last_checkpoint": None,
+            "last_compaction": None,
+            "last_error": None,
+            "database_stats": None,  # From the last checkpoint; served by /api/metrics
+        }
+        # A new leader checkpoints right away so database_stats is filled in
+        self._next_checkpoint = 0.0
+        self._next_compaction_check = time.monotonic() + COMPACTION_CHECK_INTERVAL
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="db-maintenance", daemon=True)
+        self._thread.start()
+
+    def snapshot(self) -> dict:
+        with self._stats_lock:
+            return dict(self.stats)
+
+    def _try_lead(self) -> bool:
+        if self._leader_lock is not None:
+            return True
+        if fcntl is None:
+            self._leader_lock = True
+        else:
+            lock = open(f"{self.db_path}.leader", 'a')
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock.close()
+                return False
+
+            # Held (never closed) for the life of this worker
+            self._leader_lock = lock
+
+        with self._stats_lock:
+            self.stats["is_leader"] = True
+        return True
+
+    def _run(self):
+        while True:
+            time.sleep(TICK_SECONDS)
+            try:
+                self._tick()
+            except Exception as e:
+                # Usually another process holding the DuckDB file lock, or a
+                # filesystem error; keep the thread (and leadership) alive and retry
+                print(f"[MAINTENANCE] {type(e).__name__}: {e}")
+                with self._stats_lock:
+                    self.stats["failures"] += 1
+                    self.stats["last_error"] = f"{type(e).__name__}: {e}"
+
+    def _tick(self):
+        if not self._try_lead():
+            return
+
+        now = time.monotonic()
+        if now < self._next_checkpoint and now < self._next_compaction_check:
+            return
+
+        db_stats = self._checkpoint()
+        self._next_checkpoint = now + CHECKPOINT_INTERVAL
+
+        if now >= self._next_compaction_check:
+            if db_stats["file"]["fragmentation"] >= COMPACTION_THRESHOLD:
+                self._compact()
+            self._next_compaction_check = now + COMPACTION_CHECK_INTERVAL
+
+    def _checkpoint(self) -> dict:
+        db_stats = checkpoint(self.db_path, self.gate)
+        with self._stats_lock:
+            self.stats["checkpoints"] += 1
+            self.stats["last_checkpoint"] = time.time()
+            self.stats["database_stats"] = db_stats
+        return db_stats
+
+    def _compact(self):
+        if compact(self.db_path, self.gate):
+            print(f"[MAINTENANCE] Compacted {self.db_path}")
+            with self._stats_lock:
+                self.stats["compactions"] += 1
+                self.stats["last_compaction"] = time.time()
+        else:
+            # Requests kept the gate busy (or a WAL reappeared); retried next check
+            with self._stats_lock:
+                self.stats["compactions_skipped"] += 1
+
+
+def _self_check():
+    """
+    Runs leader takeover and compaction against a scratch database using two
+    processes, the way gunicorn workers share the real one.
+    """
+    import multiprocessing
+    import shutil
+    import tempfile
+
+    if fcntl is None:
+        print("fcntl unavailable: single-process mode, nothing to check")
+        return
+
+    scratch = tempfile.mkdtemp(prefix="db-maintenance-")
+    db_path = os.path.join(scratch, "check.db")
+
+    # Mostly-deleted table, so compaction has free blocks to drop
+    con = duckdb.connect(db_path)
+    con.execute("CREATE TABLE filler AS SELECT range AS id, md5(range::VARCHAR) || md5((range + 1)::VARCHAR) AS pad FROM range(200000)")
+    con.execute("CHECKPOINT")
+    con.execute("DELETE FROM filler WHERE id >= 1000")
+    con.execute("CHECKPOINT")
+    con.close()
+
+    gate = DatabaseGate(db_path)
+    ctx = multiprocessing.get_context('fork')
+
+    # 1. Leader takeover: a second worker can't lead until the first one exits
+    def lead(ready, done):
+        scheduler = MaintenanceScheduler(db_path, gate)
+        scheduler._try_lead()
+        ready.set()
+        done.wait()
+
+    ready, done = ctx.Event(), ctx.Event()
+    leader = ctx.Process(target=lead, args=(ready, done))
+    leader.start()
+    ready.wait()
+
+    follower = MaintenanceScheduler(db_path, gate)
+    led_while_busy = follower._try_lead()
+    done.set()
+    leader.join()
+    led_after_exit = follower._try_lead()
+    print(f"[leader] while other worker leads={led_while_busy} after it exits={led_after_exit}")
+    assert not led_while_busy and led_after_exit
+
+    # 2. Compaction: skipped while another process holds a shared lease, then shrinks the file
+    def hold_lease(ready, done):
+        lease = gate.shared()
+        ready.set()
+        done.wait()
+        lease.close()
+
+    ready, done = ctx.Event(), ctx.Event()
+    reader = ctx.Process(target=hold_lease, args=(ready, done))
+    reader.start()
+    ready.wait()
+
+    before = checkpoint(db_path, gate)
+    follower._compact()  # Gives up after try_exclusive's retries (~5s)
+    skipped = follower.snapshot()["compactions_skipped"]
+    done.set()
+    reader.join()
+
+    follower._compact()
+    after = checkpoint(db_path, gate)
+    rows = after["tables"][0]["rows"]
+    print(
+        f"[compact] skipped while busy={skipped} compactions={follower.snapshot()['compactions']} "
+        f"bytes {before['file']['file_bytes']} -> {after['file']['file_bytes']} rows={rows}"
+    )
+    assert skipped == 1 and follower.snapshot()["compactions"] == 1
+    assert after["file"]["file_bytes"] < before["file"]["file_bytes"] and rows == 1000
+
+    shutil.rmtree(scratch)
+    print("--- MAINTENANCE CHECKS PASSED ---")
+
+
+if __name__ == "__main__":
+    import argparse
+    from data_access.db_print_utils import pretty_database_size, pretty_table_stats
+
+    parser = argparse.ArgumentParser(description="Checkpoint, report and optionally compact the database.")
+    parser.add_argument("--db", default="duck.db")
+    parser.add_argument("--compact", action="store_true", help="Compact regardless of fragmentation")
+    parser.add_argument("--check", action="store_true", help="Run the leader/compaction check on a scratch database")
+    args = parser.parse_args()
+
+    if args.check:
+        _self_check()
+        raise SystemExit(0)
+
+    gate = DatabaseGate(args.db)
+
+    print("\n--- BEFORE ---")
+    db_stats = checkpoint(args.db, gate)
+    print(pretty_database_size(db_stats))
+    for line in pretty_table_stats(db_stats):
+        print(line)
+
+    if args.compact or db_stats["file"]["fragmentation"] >= COMPACTION_THRESHOLD:
+        print("\nCompacted." if compact(args.db, gate) else "\nCompaction skipped (database busy).")
+        print("\n--- AFTER ---")
+        db_stats = checkpoint(args.db, gate)
+        print(pretty_database_size(db_stats))
+        for line in pretty_table_stats(db_stats):
+            print(line)
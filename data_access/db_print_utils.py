@@ -22,4 +22,25 @@ def pretty_describe_table(rows: list[tuple]) -> list[str]:
 def pretty_foreign_key(fk_row: tuple, table_columns: list[str]) -> str:
     name, table, _, column_indexes = fk_row
     cols = [table_columns[i] for i in column_indexes]
-    return f"{name}: {table}({', '.join(cols)})"
\ No newline at end of file
+    return f"{name}: {table}({', '.join(cols)})"
+
+def pretty_size(num_bytes: int) -> str:
+    size = float(num_bytes)
+    for unit in ["B", "KiB", "MiB", "GiB"]:
+        if size < 1024 or unit == "GiB":
+            return f"{size:.1f} {unit}"
+        size /= 1024
+
+def pretty_table_stats(stats: dict) -> list[str]:
+    return [
+        f"{t['table']}: {t['rows']} rows | {pretty_size(t['bytes'])}"
+        for t in stats["tables"]
+    ]
+
+def pretty_database_size(stats: dict) -> str:
+    f = stats["file"]
+    return (
+        f"file={pretty_size(f['file_bytes'])} | wal={pretty_size(f['wal_bytes'])} | "
+        f"blocks used={f['used_blocks']}/{f['total_blocks']} | "
+        f"fragmentation={f['fragmentation']:.0%}"
+    )
@@ -0,0 +1,41 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from data_access.db_bootstrap import BlogRepository
+from data_access.db_upload_utils import BlogDAO
+from rendering import RENDERER_VERSION, render_article
+
+
+def rerender_stale(dao: BlogDAO, workers: int = None, batch_size: int = 200) -> int:
+    """
+    Re-renders every article whose stored output predates RENDERER_VERSION.
+    Rendering runs in a process pool; each batch is written back in one transaction.
+    Returns the number of articles re-rendered.
+    """
+    stale_ids = dao.get_stale_render_ids()
+    if not stale_ids:
+        return 0
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for start in range(0, len(stale_ids), batch_size):
+            articles = dao.get_articles(stale_ids[start:start + batch_size])
+            rendered = pool.map(render_article, articles, chunksize=16)
+            dao.update_rendered([(a.id, r) for a, r in zip(articles, rendered)])
+
+    return len(stale_ids)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regenerate stale pre-rendered article bodies.")
+    parser.add_argument("--db", default="duck.db")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--batch-size", type=int, default=200)
+    args = parser.parse_args()
+
+    repo = BlogRepository(args.db)
+    dao = BlogDAO(repo.con)
+
+    print(f"--- RE-RENDERING STALE ARTICLES (RENDERER v{RENDERER_VERSION}) ---")
+    count = rerender_stale(dao, workers=args.workers, batch_size=args.batch_size)
+    print(f"Re-rendered {count} article(s).")
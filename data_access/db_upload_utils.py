@@ -1,11 +1,26 @@
+import base64
 import duckdb
 from dataclasses import asdict
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
 
 # Import domain models
-from models.article import Article, ArticleSummary, ContentBlock
+from models.article import (
+    ARTICLE_API_FIELDS, RENDERED_API_FIELDS, Article, ArchiveMonth, ArticleSummary, ContentBlock, RenderedArticle, TocEntry,
+    parse_date_created
+)
 from models.threads import Comment, CommentThread
-from data_access.db_bootstrap import BlogRepository
+from data_access.db_bootstrap import BlogRepository, refresh_archive_month
+from rendering import RENDERER_VERSION, render_article
+
+# Sort key for newest-first listings; undated articles sort last
+SORT_KEY_SQL = "COALESCE(published_at, TIMESTAMP '0001-01-01')"
+
+# Trailing columns of API projections: whether the stored render can be served as-is
+RENDER_STATE_SQL = (
+    f"id AS _render_id, "
+    f"COALESCE(renderer_version = {RENDERER_VERSION} AND body_html IS NOT NULL, FALSE) AS _render_fresh"
+)
 
 class BlogDAO:
     def __init__(self, connection: duckdb.DuckDBPyConnection):
@@ -17,15 +32,32 @@ class BlogDAO:
 
     def insert_article(self, article: Article):
         """
-        Inserts an Article.
+        Inserts an Article, rendering its body once so readers never have to.
+        The row, its archive month and the content version change in one transaction.
         Note: We convert ContentBlock objects to dicts for DuckDB STRUCT compatibility.
         """
         # Convert list of dataclasses to list of dicts for STRUCT compatibility
         blocks_data = [asdict(b) for b in article.content_blocks]
+        published_at = article.published_at or parse_date_created(article.date_created)
+        rendered = render_article(article)
 
+        self.con.execute("BEGIN TRANSACTION")
+        try:
+            self._insert_article_row(article, blocks_data, published_at, rendered)
+            refresh_archive_month(self.con, published_at)
+            self.bump_content_version()
+            self.con.execute("COMMIT")
+        except Exception:
+            self.con.execute("ROLLBACK")
+            raise
+
+    def _insert_article_row(self, article: Article, blocks_data: List[dict], published_at, rendered: RenderedArticle):
         self.con.execute("""
-            INSERT INTO articles (id, title, date_created, author, topics, article_img_link, content_blocks)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
+            INSERT INTO articles (
+                id, title, date_created, author, topics, article_img_link, content_blocks, published_at,
+                body_html, toc, excerpt, word_count, reading_minutes, renderer_version
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """, (
             article.id, 
             article.title, 
@@ -33,7 +65,14 @@ class BlogDAO:
             article.author, 
             article.topics, 
             article.article_img_link, 
-            blocks_data
+            blocks_data,
+            published_at,
+            rendered.body_html,
+            [asdict(t) for t in rendered.toc],
+            rendered.excerpt,
+            rendered.word_count,
+            rendered.reading_minutes,
+            rendered.renderer_version
         ))
 
     def insert_comment(self, article_id: int, comment: Comment, parent_id: Optional[int] = None):
@@ -68,11 +107,58 @@ class BlogDAO:
 
     def delete_article(self, article_id: int):
         """
-        Deletes an article and its associated comments.
+        Deletes an article and its associated comments in a single transaction.
         """
-        # Delete comments first due to FK constraint (if enforced, otherwise good practice)
-        self.con.execute("DELETE FROM comments WHERE article_id = ?", (article_id,))
-        self.con.execute("DELETE FROM articles WHERE id = ?", (article_id,))
+        self.con.execute("BEGIN TRANSACTION")
+        try:
+            self.con.execute("DELETE FROM comments WHERE article_id = ?", (article_id,))
+            row = self.con.execute(
+                "DELETE FROM articles WHERE id = ? RETURNING published_at", (article_id,)
+            ).fetchone()
+            if row is not None:
+                refresh_archive_month(self.con, row[0])
+            self.bump_content_version()
+            self.con.execute("COMMIT")
+        except Exception:
+            self.con.execute("ROLLBACK")
+            raise
+
+    def update_rendered(self, rendered_rows: List[tuple], bump_version: bool = True):
+        """
+        Stores (article_id, RenderedArticle) pairs in a single transaction.
+        Bumps the content version so API ETags change with the new output;
+        lazy write-backs pass bump_version=False since readers already saw
+        the same freshly rendered output.
+        """
+        self.con.execute("BEGIN TRANSACTION")
+        try:
+            self.con.executemany("""
+                UPDATE articles
+                SET body_html = ?, toc = ?, excerpt = ?, word_count = ?, reading_minutes = ?, renderer_version = ?
+                WHERE id = ?
+            """, [
+                (
+                    r.body_html,
+                    [asdict(t) for t in r.toc],
+                    r.excerpt,
+                    r.word_count,
+                    r.reading_minutes,
+                    r.renderer_version,
+                    article_id
+                ) for article_id, r in rendered_rows
+            ])
+            if bump_version:
+                self.bump_content_version()
+            self.con.execute("COMMIT")
+        except Exception:
+            self.con.execute("ROLLBACK")
+            raise
+
+    def bump_content_version(self):
+        """
+        Invalidates derived content (feeds, sitemaps) across all workers.
+        """
+        self.con.execute("UPDATE content_version SET version = version + 1")
 
     # ---------------------------------------------------------
     # QUERIES
@@ -80,7 +166,7 @@ class BlogDAO:
 
     def get_article(self, article_id: int) -> Optional[Article]:
         row = self.con.execute("""
-            SELECT id, title, date_created, author, topics, article_img_link, content_blocks 
+            SELECT id, title, date_created, author, topics, article_img_link, content_blocks, published_at 
             FROM articles 
             WHERE id = ?
         """, (article_id,)).fetchone()
@@ -88,11 +174,39 @@ class BlogDAO:
         if not row:
             return None
 
-        # DuckDB returns STRUCTs as dicts automatically in Python
-        content_blocks = [
-            ContentBlock(text=b['text'], is_header=b['is_header']) 
-            for b in row[6]
-        ]
+        return self._row_to_article(row)
+
+    def get_articles(self, article_ids: List[int]) -> List[Article]:
+        if not article_ids:
+            return []
+
+        rows = self.con.execute("""
+            SELECT id, title, date_created, author, topics, article_img_link, content_blocks, published_at 
+            FROM articles 
+            WHERE id IN (SELECT UNNEST(?))
+            ORDER BY id ASC
+        """, (article_ids,)).fetchall()
+
+        return [self._row_to_article(r) for r in rows]
+
+    def get_rendered_article(self, article_id: int) -> Optional[Article]:
+        """
+        Article for display: metadata plus the pre-rendered body, without reading
+        `content_blocks`. Rows never rendered, or rendered by an older renderer,
+        are rendered once here and written back.
+        """
+        row = self.con.execute("""
+            SELECT id, title, date_created, author, topics, article_img_link, published_at,
+                   body_html, toc, excerpt, word_count, reading_minutes, renderer_version
+            FROM articles 
+            WHERE id = ?
+        """, (article_id,)).fetchone()
+
+        if not row:
+            return None
+
+        if row[12] != RENDERER_VERSION or row[7] is None:
+            return self._render_and_store(article_id)
 
         return Article(
             id=row[0],
@@ -101,28 +215,222 @@ class BlogDAO:
             author=row[3],
             topics=row[4],
             article_img_link=row[5],
-            content_blocks=content_blocks
+            content_blocks=[],
+            published_at=row[6],
+            rendered=RenderedArticle(
+                body_html=row[7],
+                toc=[TocEntry(anchor=t['anchor'], text=t['text']) for t in row[8] or []],
+                excerpt=row[9],
+                word_count=row[10],
+                reading_minutes=row[11],
+                renderer_version=row[12]
+            )
         )
 
+    def _render_and_store(self, article_id: int) -> Optional[Article]:
+        """Renders one article and writes it back; None if it was deleted meanwhile."""
+        article = self.get_article(article_id)
+        if article is None:
+            return None
+        article.rendered = render_article(article)
+        self.update_rendered([(article_id, article.rendered)], bump_version=False)
+        article.content_blocks = []
+        return article
+
+    def get_stale_render_ids(self) -> List[int]:
+        rows = self.con.execute("""
+            SELECT id FROM articles
+            WHERE renderer_version IS NULL OR renderer_version <> ?
+            ORDER BY id ASC
+        """, (RENDERER_VERSION,)).fetchall()
+        return [r[0] for r in rows]
+
     def get_summaries(self, limit: int, offset: int) -> List[ArticleSummary]:
+        """
+        Newest-first summaries. Undated articles sort last.
+        """
         rows = self.con.execute("""
-            SELECT id, title, date_created, author, topics, article_img_link 
+            SELECT id, title, date_created, author, topics, article_img_link, published_at 
             FROM articles
-            ORDER BY id ASC
+            ORDER BY published_at DESC NULLS LAST, id DESC
             LIMIT ? OFFSET ?
         """, (limit, offset)).fetchall()
 
-        return [
-            ArticleSummary(
-                id=r[0],
-                title=r[1],
-                date_created=r[2],
-                author=r[3],
-                topics=r[4],
-                article_img_link=r[5]
-            ) for r in rows
+        return [self._row_to_summary(r) for r in rows]
+
+    def get_summaries_between(self, start: datetime, end: datetime, limit: int, offset: int) -> List[ArticleSummary]:
+        """
+        Newest-first summaries published in [start, end).
+        The range predicate lets DuckDB prune row groups via their zone maps.
+        """
+        rows = self.con.execute("""
+            SELECT id, title, date_created, author, topics, article_img_link, published_at 
+            FROM articles
+            WHERE published_at >= ? AND published_at < ?
+            ORDER BY published_at DESC, id DESC
+            LIMIT ? OFFSET ?
+        """, (start, end, limit, offset)).fetchall()
+
+        return [self._row_to_summary(r) for r in rows]
+
+    def get_article_count_between(self, start: datetime, end: datetime) -> int:
+        return self.con.execute("""
+            SELECT COUNT(*) FROM articles
+            WHERE published_at >= ? AND published_at < ?
+        """, (start, end)).fetchone()[0]
+
+    def get_archive_counts(self) -> List[ArchiveMonth]:
+        rows = self.con.execute("""
+            SELECT year, month, article_count
+            FROM article_archive
+            ORDER BY year DESC, month DESC
+        """).fetchall()
+
+        return [ArchiveMonth(year=r[0], month=r[1], article_count=r[2]) for r in rows]
+
+    def get_content_version(self) -> int:
+        return self.con.execute("SELECT version FROM content_version").fetchone()[0]
+
+    def iter_sitemap_entries(self, batch_size: int = 1000):
+        """
+        Streams (id, published_at) for every article without materializing the table.
+        """
+        cursor = self.con.cursor()
+        cursor.execute("SELECT id, published_at FROM articles ORDER BY id ASC")
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cursor.close()
+
+    # ---------------------------------------------------------
+    # JSON API (projected reads)
+    # ---------------------------------------------------------
+
+    def get_article_fields(self, article_id: int, fields: Sequence[str]) -> Optional[dict]:
+        """
+        Reads only the requested columns of one article.
+        `fields` must come from ARTICLE_API_FIELDS; they are interpolated into the SELECT.
+        """
+        columns = self._api_columns(fields)
+        row = self.con.execute(f"""
+            SELECT {columns}, {RENDER_STATE_SQL}
+            FROM articles
+            WHERE id = ?
+        """, (article_id,)).fetchone()
+
+        if not row:
+            return None
+
+        return self._api_item(fields, row)
+
+    def get_summary_page(self, fields: Sequence[str], limit: int, cursor: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+        """
+        Keyset-paginated, newest-first projection of the articles table.
+        Returns (items, next_cursor); next_cursor is None on the last page.
+        """
+        columns = self._api_columns(fields)
+        params = []
+        where = ""
+        if cursor is not None:
+            sort_key, last_id = self.decode_cursor(cursor)
+            where = f"WHERE {SORT_KEY_SQL} < ? OR ({SORT_KEY_SQL} = ? AND id < ?)"
+            params = [sort_key, sort_key, last_id]
+
+        rows = self.con.execute(f"""
+            SELECT {columns}, {RENDER_STATE_SQL}, {SORT_KEY_SQL} AS _sort_key, id AS _cursor_id
+            FROM articles
+            {where}
+            ORDER BY _sort_key DESC, _cursor_id DESC
+            LIMIT ?
+        """, params + [limit + 1]).fetchall()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        items = [item for item in (self._api_item(fields, r) for r in rows) if item is not None]
+
+        next_cursor = self.encode_cursor(rows[-1][-2], rows[-1][-1]) if has_more else None
+        return items, next_cursor
+
+    def _api_item(self, fields: Sequence[str], row: tuple) -> Optional[dict]:
+        """
+        Zips a projected row into a dict. Rendered fields of rows that were
+        never rendered, or by an older renderer, go through the same
+        render-and-store fallback as get_rendered_article.
+        None if the article was deleted before it could be rendered.
+        """
+        item = dict(zip(fields, row))
+        article_id, fresh = row[len(fields)], row[len(fields) + 1]
+
+        if not fresh and any(f in RENDERED_API_FIELDS for f in fields):
+            article = self._render_and_store(article_id)
+            if article is None:
+                return None
+            rendered = asdict(article.rendered)
+            for f in fields:
+                if f in RENDERED_API_FIELDS:
+                    item[f] = rendered[f]
+
+        return item
+
+    @staticmethod
+    def encode_cursor(sort_key: datetime, article_id: int) -> str:
+        raw = f"{sort_key.isoformat()}|{article_id}".encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+        """Raises ValueError for malformed cursors."""
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            sort_key, article_id = base64.urlsafe_b64decode(padded).decode("utf-8").split("|")
+            return datetime.fromisoformat(sort_key), int(article_id)
+        except (UnicodeDecodeError, ValueError) as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+
+    @staticmethod
+    def _api_columns(fields: Sequence[str]) -> str:
+        if not fields:
+            raise ValueError("No fields requested")
+        unknown = [f for f in fields if f not in ARTICLE_API_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+        return ", ".join(fields)
+
+    @staticmethod
+    def _row_to_article(row) -> Article:
+        # DuckDB returns STRUCTs as dicts automatically in Python
+        content_blocks = [
+            ContentBlock(text=b['text'], is_header=b['is_header']) 
+            for b in row[6]
         ]
 
+        return Article(
+            id=row[0],
+            title=row[1],
+            date_created=row[2],
+            author=row[3],
+            topics=row[4],
+            article_img_link=row[5],
+            content_blocks=content_blocks,
+            published_at=row[7]
+        )
+
+    @staticmethod
+    def _row_to_summary(r) -> ArticleSummary:
+        return ArticleSummary(
+            id=r[0],
+            title=r[1],
+            date_created=r[2],
+            author=r[3],
+            topics=r[4],
+            article_img_link=r[5],
+            published_at=r[6]
+        )
+
     def get_total_article_count(self) -> int:
         return self.con.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
 
@@ -0,0 +1,261 @@
+"""
+Atom feed and sitemap generation, cached per content version.
+
+Bodies are written once as gzip files under CACHE_DIR, so every worker can serve
+them precompressed. They are only regenerated after `create_article` or
+`delete_article` bumps the content version. Absolute URLs use the canonical
+base URL the app is configured with, never the request's Host header, so the
+cache holds one body per content version.
+"""
+import glob
+import gzip
+import os
+import re
+import sys
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Optional
+from xml.sax.saxutils import escape
+
+# --- CONFIGURATION ---
+CACHE_DIR = os.environ.get('FEED_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache'))
+FEED_ENTRY_LIMIT = 20
+SITEMAP_SHARD_SIZE = 50000  # Max URLs per file allowed by the sitemap protocol
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+@dataclass
+class CachedBody:
+    etag     : str
+    gzip_body: bytes
+
+# file path -> CachedBody for _memory_version only (per worker; files on disk are shared)
+_memory_cache = {}
+_memory_version = None
+
+
+class GzipXmlWriter:
+    """
+    Streams XML text straight into a gzip file.
+    The file is written under a temp name and renamed into place on success,
+    so concurrent workers never see a half-written body.
+    """
+    def __init__(self, final_path: str):
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+        fd, self.tmp_path = tempfile.mkstemp(dir=os.path.dirname(final_path), suffix='.tmp')
+        self.final_path = final_path
+        self._raw = os.fdopen(fd, 'wb')
+        self._gz = gzip.GzipFile(fileobj=self._raw, mode='wb', mtime=0)
+
+    def write(self, text: str):
+        self._gz.write(text.encode('utf-8'))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._gz.close()
+        self._raw.close()
+        if exc_type is None:
+            os.replace(self.tmp_path, self.final_path)
+        else:
+            os.remove(self.tmp_path)
+        return False
+
+
+# ---------------------------------------------------------
+# PUBLIC API
+# ---------------------------------------------------------
+
+def get_feed(service, base_url: str) -> CachedBody:
+    version = service.get_content_version()
+    path = os.path.join(CACHE_DIR, f"feed-{_cache_key(version)}.xml.gz")
+    return _get_or_build(path, lambda p: _write_feed(service, base_url, p), 'feed', version)
+
+
+def get_sitemap(service, base_url: str, shard: Optional[int] = None) -> Optional[CachedBody]:
+    """
+    Returns the sitemap (a plain urlset, or a sitemap index when the archive
+    needs several shards), or one numbered shard. None if the shard doesn't exist.
+    """
+    version = service.get_content_version()
+    key = _cache_key(version)
+    index_path = os.path.join(CACHE_DIR, f"sitemap-{key}.xml.gz")
+    index = _get_or_build(index_path, lambda p: _write_sitemaps(service, base_url, key, p), 'sitemap', version)
+
+    if shard is None:
+        return index
+
+    shard_path = os.path.join(CACHE_DIR, f"sitemap-{key}-{shard}.xml.gz")
+    return _get_or_build(shard_path, None, 'sitemap', version)
+
+
+# ---------------------------------------------------------
+# CACHE HELPERS
+# ---------------------------------------------------------
+
+def _cache_key(version: int) -> str:
+    return f"v{version}"
+
+
+def _get_or_build(path: str, build: Optional[Callable[[str], None]], prefix: str, version: int) -> Optional[CachedBody]:
+    """
+    Returns the body at `path`, building it if it's missing (another worker's
+    _prune may remove it at any time). Without a builder, a missing file is None.
+    """
+    global _memory_version
+    if version != _memory_version:
+        # Bodies of other versions are never served again by this worker
+        _memory_cache.clear()
+        _memory_version = version
+
+    cached = _memory_cache.get(path)
+    if cached is not None:
+        return cached
+
+    try:
+        body = _read(path)
+    except FileNotFoundError:
+        if build is None:
+            return None
+        build(path)
+        _prune(prefix, version)
+        body = _read(path)
+
+    name = os.path.basename(path)[:-len('.xml.gz')]
+    cached = CachedBody(etag=name, gzip_body=body)
+    _memory_cache[path] = cached
+    return cached
+
+
+def _read(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _prune(prefix: str, current_version: int):
+    """Removes bodies left over from older content versions."""
+    pattern = re.compile(rf"^{prefix}-v(\d+)[-.]")
+    for path in glob.glob(os.path.join(CACHE_DIR, f"{prefix}-v*.xml.gz")):
+        match = pattern.match(os.path.basename(path))
+        if match and int(match.group(1)) < current_version:
+            _memory_cache.pop(path, None)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def _attr(value: str) -> str:
+    return escape(value, {'"': '&quot;'})
+
+
+def _iso(ts: Optional[datetime]) -> str:
+    if ts is None:
+        return EPOCH.isoformat()
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.isoformat()
+
+
+# ---------------------------------------------------------
+# WRITERS
+# ---------------------------------------------------------
+
+def _write_feed(service, base_url: str, path: str):
+    summaries = service.get_summaries(FEED_ENTRY_LIMIT, 0)
+    dates = [s.published_at for s in summaries if s.published_at is not None]
+    updated = max(dates) if dates else None
+
+    with GzipXmlWriter(path) as out:
+        out.write('<?xml version="1.0" encoding="utf-8"?>\n')
+        out.write('<feed xmlns="http://www.w3.org/2005/Atom">\n')
+        out.write('  <title>My personal Blog + Projects</title>\n')
+        out.write(f'  <id>{escape(base_url)}</id>\n')
+        out.write(f'  <link href="{_attr(base_url)}"/>\n')
+        out.write(f'  <link rel="self" href="{_attr(base_url + "feed.xml")}"/>\n')
+        out.write(f'  <updated>{_iso(updated)}</updated>\n')
+
+        for s in summaries:
+            url = f"{base_url}article/{s.id}"
+            out.write('  <entry>\n')
+            out.write(f'    <title>{escape(s.title or "")}</title>\n')
+            out.write(f'    <id>{escape(url)}</id>\n')
+            out.write(f'    <link href="{_attr(url)}"/>\n')
+            out.write(f'    <updated>{_iso(s.published_at)}</updated>\n')
+            out.write(f'    <author><name>{escape(s.author or "")}</name></author>\n')
+            for topic in s.topics or []:
+                out.write(f'    <category term="{_attr(topic)}"/>\n')
+            out.write('  </entry>\n')
+
+        out.write('</feed>\n')
+
+
+def _write_sitemaps(service, base_url: str, key: str, index_path: str):
+    """
+    Streams article URLs into shards of SITEMAP_SHARD_SIZE. A single shard
+    becomes the sitemap itself; several shards get a sitemap index, which is
+    written last so its presence means every shard is complete.
+    Each writer renames only its own temp file, so concurrent builders of the
+    same version can't move each other's output away.
+    """
+    shard_count = 0
+    written = SITEMAP_SHARD_SIZE
+    writer = None
+
+    try:
+        for article_id, published_at in service.iter_sitemap_entries():
+            if written >= SITEMAP_SHARD_SIZE:
+                if writer is not None:
+                    _close_urlset(writer)
+                shard_count += 1
+                writer = _open_urlset(os.path.join(CACHE_DIR, f"sitemap-{key}-{shard_count}.xml.gz"))
+                written = 0
+                if shard_count == 1:
+                    writer.write(f'  <url><loc>{escape(base_url)}home</loc></url>\n')
+                    written += 1
+
+            loc = escape(f"{base_url}article/{article_id}")
+            if published_at is not None:
+                writer.write(f'  <url><loc>{loc}</loc><lastmod>{published_at.date().isoformat()}</lastmod></url>\n')
+            else:
+                writer.write(f'  <url><loc>{loc}</loc></url>\n')
+            written += 1
+    except BaseException:
+        if writer is not None:
+            writer.__exit__(*sys.exc_info())
+        raise
+
+    if writer is None:
+        # Empty archive: the sitemap only lists the home page
+        shard_count = 1
+        writer = _open_urlset(index_path)
+        writer.write(f'  <url><loc>{escape(base_url)}home</loc></url>\n')
+
+    if shard_count == 1:
+        # The only shard is still open: publish it as the sitemap itself
+        writer.final_path = index_path
+    _close_urlset(writer)
+
+    if shard_count == 1:
+        return
+
+    with GzipXmlWriter(index_path) as out:
+        out.write('<?xml version="1.0" encoding="utf-8"?>\n')
+        out.write('<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+        for n in range(1, shard_count + 1):
+            out.write(f'  <sitemap><loc>{escape(base_url)}sitemap-{n}.xml</loc></sitemap>\n')
+        out.write('</sitemapindex>\n')
+
+
+def _open_urlset(path: str) -> GzipXmlWriter:
+    writer = GzipXmlWriter(path)
+    writer.write('<?xml version="1.0" encoding="utf-8"?>\n')
+    writer.write('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+    return writer
+
+
+def _close_urlset(writer: GzipXmlWriter):
+    writer.write('</urlset>\n')
+    writer.__exit__(None, None, None)
@@ -0,0 +1,80 @@
+"""
+Jinja fragment caching for shared page components.
+
+    {% cache 'sidebar/archive', ttl=300 %} ... {% endcache %}
+
+The rendered fragment is kept per worker, keyed by fragment name and the current
+content version, so a write invalidates every fragment at once; `ttl` (seconds)
+bounds how long a fragment lives even when content doesn't change. Only wrap
+fragments that do work (queries, loops); for a constant template the lock and
+lookup cost more than rendering it.
+"""
+import threading
+import time
+from typing import Callable, Optional
+
+from jinja2 import nodes
+from jinja2.ext import Extension
+
+DEFAULT_TTL = 300
+
+
+class FragmentCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}  # (name, version) -> (expires_at, html)
+        self.stats = {"hits": 0, "misses": 0}
+
+    def get_or_render(self, name: str, version, ttl: Optional[float], render: Callable[[], str]) -> str:
+        key = (name, version)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.stats["hits"] += 1
+                return entry[1]
+            self.stats["misses"] += 1
+
+        html = render()
+        expires_at = now + ttl if ttl is not None else float('inf')
+
+        with self._lock:
+            # Drop entries for this fragment from older content versions
+            for stale in [k for k in self._entries if k[0] == name and k != key]:
+                del self._entries[stale]
+            self._entries[key] = (expires_at, html)
+        return html
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class FragmentCacheExtension(Extension):
+    tags = {"cache"}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(
+            fragment_cache=FragmentCache(),
+            fragment_cache_version=lambda: 0,  # Replaced by the app with the content version lookup
+        )
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+
+        ttl = nodes.Const(DEFAULT_TTL)
+        if parser.stream.skip_if("comma"):
+            parser.stream.expect("name:ttl")
+            parser.stream.expect("assign")
+            ttl = parser.parse_expression()
+        args.append(ttl)
+
+        body = parser.parse_statements(("name:endcache",), drop_needle=True)
+        return nodes.CallBlock(self.call_method("_render_cached", args), [], [], body).set_lineno(lineno)
+
+    def _render_cached(self, name: str, ttl, caller) -> str:
+        env = self.environment
+        return env.fragment_cache.get_or_render(name, env.fragment_cache_version(), ttl, caller)
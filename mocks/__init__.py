@@ -1,4 +1,4 @@
-from .article_data import Article, ContentBlock, fill_article , ArticleSummary , get_summaries , get_total_count
+from .article_data import Article, ContentBlock, fill_article , ArticleSummary , get_summaries , get_total_count , get_summaries_between , get_count_between , get_archive_counts , iter_sitemap_entries
 from .comment_thread import CommentThread , get_comment_thread
 
-__all__ = ["Article", "ContentBlock", "fill_article", "CommentThread", "get_comment_thread", "get_summaries" , "ArticleSummary", "get_total_count"]
+__all__ = ["Article", "ContentBlock", "fill_article", "CommentThread", "get_comment_thread", "get_summaries" , "ArticleSummary", "get_total_count", "get_summaries_between", "get_count_between", "get_archive_counts", "iter_sitemap_entries"]
\ No newline at end of file
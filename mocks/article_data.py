@@ -1,7 +1,9 @@
+from collections import Counter
 from dataclasses import dataclass
+from datetime import datetime
 from typing import List
 
-from models.article import Article , ArticleSummary , ContentBlock
+from models.article import Article , ArticleSummary , ContentBlock , ArchiveMonth , parse_date_created
 from models.threads import CommentThread , Comment
 
 def fill_article(article_id : int) -> Article:
@@ -58,4 +60,30 @@ def get_summaries(page_start: int, number_of_articles: int) -> List[ArticleSumma
     return MOCK_SUMMARIES[page_start : page_start + number_of_articles]
 
 def get_total_count():
-    return len(MOCK_SUMMARIES)
\ No newline at end of file
+    return len(MOCK_SUMMARIES)
+
+def _in_range(summary: ArticleSummary, start: datetime, end: datetime) -> bool:
+    published_at = parse_date_created(summary.date_created)
+    return published_at is not None and start <= published_at < end
+
+def get_summaries_between(start: datetime, end: datetime, page_start: int, number_of_articles: int) -> List[ArticleSummary]:
+    """
+    Simulates: SELECT * FROM articles WHERE published_at >= start AND published_at < end
+    """
+    matches = [s for s in MOCK_SUMMARIES if _in_range(s, start, end)]
+    return matches[page_start : page_start + number_of_articles]
+
+def get_count_between(start: datetime, end: datetime) -> int:
+    return sum(1 for s in MOCK_SUMMARIES if _in_range(s, start, end))
+
+def get_archive_counts() -> List[ArchiveMonth]:
+    dates = [parse_date_created(s.date_created) for s in MOCK_SUMMARIES]
+    counts = Counter((d.year, d.month) for d in dates if d is not None)
+    return [ArchiveMonth(year=y, month=m, article_count=c) for (y, m), c in sorted(counts.items(), reverse=True)]
+
+def iter_sitemap_entries():
+    """
+    Simulates: SELECT id, published_at FROM articles ORDER BY id
+    """
+    for s in MOCK_SUMMARIES:
+        yield s.id, parse_date_created(s.date_created)
@@ -1,11 +1,38 @@
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 from dataclasses import dataclass
 
+# Formats accepted in the free-form `date_created` field, tried in order.
+DATE_CREATED_FORMATS = ['%B %d, %Y', '%Y-%m-%d']
+
+# Article columns the JSON API can project with ?fields=, and the defaults per endpoint
+ARTICLE_API_FIELDS = (
+    'id', 'title', 'date_created', 'author', 'topics', 'article_img_link', 'published_at',
+    'content_blocks', 'body_html', 'toc', 'excerpt', 'word_count', 'reading_minutes'
+)
+RENDERED_API_FIELDS = ('body_html', 'toc', 'excerpt', 'word_count', 'reading_minutes')
+SUMMARY_API_FIELDS = ('id', 'title', 'date_created', 'author', 'topics', 'article_img_link', 'published_at')
+DETAIL_API_FIELDS = SUMMARY_API_FIELDS + ('content_blocks',)
+
 @dataclass
 class ContentBlock:
     text     : str
     is_header: bool
 
+@dataclass
+class TocEntry:
+    anchor: str
+    text  : str
+
+@dataclass
+class RenderedArticle:
+    body_html       : str
+    toc             : List[TocEntry]
+    excerpt         : str
+    word_count      : int
+    reading_minutes : int
+    renderer_version: int
+
 @dataclass
 class Article:
     id              : int
@@ -15,6 +42,8 @@ class Article:
     topics          : List[str]
     article_img_link: str
     content_blocks  : List[ContentBlock]
+    published_at    : Optional[datetime] = None
+    rendered        : Optional[RenderedArticle] = None
     
 @dataclass
 class ArticleSummary:
@@ -24,3 +53,29 @@ class ArticleSummary:
     author          : str
     topics          : List[str]
     article_img_link: str
+    published_at    : Optional[datetime] = None
+
+@dataclass
+class ArchiveMonth:
+    year         : int
+    month        : int
+    article_count: int
+
+    @property
+    def label(self) -> str:
+        return datetime(self.year, self.month, 1).strftime('%B %Y')
+
+def parse_date_created(date_created: str) -> Optional[datetime]:
+    """Parses a display date ("January 10, 2026") into a datetime, or None."""
+    for fmt in DATE_CREATED_FORMATS:
+        try:
+            return datetime.strptime(date_created.strip(), fmt)
+        except (ValueError, AttributeError):
+            continue
+    return None
+
+def month_range(year: int, month: int) -> tuple:
+    """Returns the half-open [start, end) datetime range covering a month."""
+    start = datetime(year, month, 1)
+    end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+    return start, end
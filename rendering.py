@@ -0,0 +1,69 @@
+"""
+Write-time rendering of article bodies.
+
+`render_article` turns content blocks into sanitized HTML once, when the article
+is stored, together with the metadata the pages need (TOC, excerpt, word count,
+reading time). Bump RENDERER_VERSION whenever the output changes; stored rows
+with an older version are regenerated by `data_access/db_render_utils.py`.
+"""
+import math
+import re
+import unicodedata
+from typing import List
+
+from markupsafe import escape
+
+from models.article import Article, ContentBlock, RenderedArticle, TocEntry
+
+RENDERER_VERSION = 1
+
+WORDS_PER_MINUTE = 200
+EXCERPT_LENGTH = 200
+
+_WORD_RE = re.compile(r"\w+(?:['’-]\w+)*")
+
+
+def slugify(text: str) -> str:
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    text = re.sub(r"[^\w\s-]", "", text).strip().lower()
+    return re.sub(r"[\s_-]+", "-", text) or "section"
+
+
+def make_excerpt(blocks: List[ContentBlock], length: int = EXCERPT_LENGTH) -> str:
+    """First paragraph, cut at a word boundary."""
+    text = next((b.text for b in blocks if not b.is_header and b.text), "")
+    if len(text) <= length:
+        return text
+    return text[:length].rsplit(" ", 1)[0].rstrip(",.;:") + "…"
+
+
+def render_article(article: Article) -> RenderedArticle:
+    parts = []
+    toc = []
+    used_anchors = set()
+    word_count = 0
+
+    for block in article.content_blocks:
+        text = block.text or ""
+        word_count += len(_WORD_RE.findall(text))
+
+        if block.is_header:
+            anchor = base = slugify(text)
+            n = 2
+            while anchor in used_anchors:
+                anchor = f"{base}-{n}"
+                n += 1
+            used_anchors.add(anchor)
+            toc.append(TocEntry(anchor=anchor, text=text))
+            parts.append(f'<h2 class="fw-bolder mb-4 mt-5" id="{anchor}">{escape(text)}</h2>')
+        else:
+            parts.append(f'<p class="fs-5 mb-4">{escape(text)}</p>')
+
+    return RenderedArticle(
+        body_html="\n".join(parts),
+        toc=toc,
+        excerpt=make_excerpt(article.content_blocks),
+        word_count=word_count,
+        reading_minutes=max(1, math.ceil(word_count / WORDS_PER_MINUTE)),
+        renderer_version=RENDERER_VERSION
+    )
@@ -2,8 +2,12 @@
 
 export USE_MOCK_DATA=False
 
+# Public origin for absolute links in /feed.xml and /sitemap.xml
+export SITE_URL="${SITE_URL:?set SITE_URL to the public origin, e.g. https://blog.example.com}"
+
 PORT=5123
 WORKERS=3
+THREADS=4  # Lets concurrent identical reads coalesce inside a worker
 APP_MODULE="app:app"
 LOGFILE="app.log"
 
@@ -11,6 +15,7 @@ fuser -k ${PORT}/tcp 2>/dev/null || true
 
 nohup gunicorn \
   -w ${WORKERS} \
+  --threads ${THREADS} \
   -b 127.0.0.1:${PORT} \
   ${APP_MODULE} \
   > ${LOGFILE} 2>&1 &
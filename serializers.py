@@ -0,0 +1,26 @@
+"""
+JSON encoding for API responses.
+
+Uses orjson when it is installed (it serializes dicts, lists and datetimes
+natively, straight to bytes); otherwise falls back to a compact stdlib encoder
+producing the same output shape.
+"""
+import json
+from datetime import date, datetime
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(obj):
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, default=_default, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
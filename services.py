@@ -1,15 +1,31 @@
 import os
+from datetime import datetime
 from flask import g
 from typing import Union
 
 # Import Sources
 import mocks
 from data_access.db_bootstrap import BlogRepository
+from data_access.db_maintenance import DatabaseGate, MaintenanceScheduler
 from data_access.db_upload_utils import BlogDAO
 from models.article import Article
+from rendering import render_article
+from singleflight import SingleFlight
 
 # --- CONFIGURATION ---
 USE_MOCK_DATA = os.environ.get('USE_MOCK_DATA', 'True') == 'True'
+DB_PATH = "duck.db"
+# Lock files / result slots for coalescing reads across workers ('' disables)
+SINGLEFLIGHT_DIR = os.environ.get(
+    'SINGLEFLIGHT_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'singleflight')
+)
+
+# Shared by every RealService in this worker, keyed by (operation, args)
+read_flight = SingleFlight(shared_dir=SINGLEFLIGHT_DIR or None)
+
+# Requests hold the gate shared; maintenance (leader worker only) may take it exclusively
+db_gate = DatabaseGate(DB_PATH)
+maintenance = MaintenanceScheduler(DB_PATH, db_gate)
 
 class MockService:
     """Adapts the mocks module to the standard interface"""
@@ -17,6 +33,11 @@ class MockService:
         # Mocks typically expect strings, but we standardize on int here
         return mocks.fill_article(str(article_id))
     
+    def get_rendered_article(self, article_id: int):
+        article = self.get_article(article_id)
+        article.rendered = render_article(article)
+        return article
+
     def get_comment_thread(self, article_id: int):
         return mocks.get_comment_thread("mock_id")
 
@@ -26,6 +47,45 @@ class MockService:
 
     def get_total_count(self):
         return mocks.get_total_count()
+
+    def get_summaries_between(self, start: datetime, end: datetime, limit: int, offset: int):
+        return mocks.get_summaries_between(start, end, offset, limit)
+
+    def get_count_between(self, start: datetime, end: datetime):
+        return mocks.get_count_between(start, end)
+
+    def get_archive_counts(self):
+        return mocks.get_archive_counts()
+
+    def get_content_version(self):
+        # Mock content never changes
+        return 0
+
+    def iter_sitemap_entries(self):
+        return mocks.iter_sitemap_entries()
+
+    def get_article_fields(self, article_id: int, fields):
+        article = self.get_rendered_article(article_id)
+        values = {
+            'content_blocks': [{'text': b.text, 'is_header': b.is_header} for b in article.content_blocks],
+            'toc': [{'anchor': t.anchor, 'text': t.text} for t in article.rendered.toc],
+            'body_html': article.rendered.body_html,
+            'excerpt': article.rendered.excerpt,
+            'word_count': article.rendered.word_count,
+            'reading_minutes': article.rendered.reading_minutes,
+        }
+        return {f: values[f] if f in values else getattr(article, f) for f in fields}
+
+    def get_summary_page(self, fields, limit: int, cursor: str = None):
+        # Mock cursors are plain offsets
+        try:
+            offset = int(cursor) if cursor is not None else 0
+        except ValueError as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+        summaries = mocks.get_summaries(offset, limit + 1)
+        items = [{f: getattr(s, f, None) for f in fields} for s in summaries[:limit]]
+        next_cursor = str(offset + limit) if len(summaries) > limit else None
+        return items, next_cursor
     
     def delete_article(self, article_id: int):
         print(f"[MOCK] Would delete article ID: {article_id}")
@@ -37,25 +97,80 @@ class RealService:
         # Check if we are inside a Flask context (g available)
         if g:
             if 'dao' not in g:
-                repo = BlogRepository("duck.db")
+                g.db_lease = db_gate.shared()
+                repo = BlogRepository(DB_PATH, migrate=False)  # Migrated at boot by migrate_database
                 g.dao = BlogDAO(repo.con)
             return g.dao
         else:
             # Fallback for testing without Flask (CLI scripts)
-            repo = BlogRepository("duck.db")
+            repo = BlogRepository(DB_PATH)
             return BlogDAO(repo.con)
 
     def get_article(self, article_id: int):
-        return self.get_dao().get_article(article_id)
+        return read_flight.do(
+            ('get_article', article_id),
+            lambda: self.get_dao().get_article(article_id)
+        )
+
+    def get_rendered_article(self, article_id: int):
+        return read_flight.do(
+            ('get_rendered_article', article_id),
+            lambda: self.get_dao().get_rendered_article(article_id)
+        )
 
     def get_comment_thread(self, article_id: int):
-        return self.get_dao().get_comment_thread(article_id)
+        return read_flight.do(
+            ('get_comment_thread', article_id),
+            lambda: self.get_dao().get_comment_thread(article_id)
+        )
 
     def get_summaries(self, limit: int, offset: int):
-        return self.get_dao().get_summaries(limit, offset)
+        return read_flight.do(
+            ('get_summaries', limit, offset),
+            lambda: self.get_dao().get_summaries(limit, offset)
+        )
 
     def get_total_count(self):
-        return self.get_dao().get_total_article_count()
+        return read_flight.do(
+            ('get_total_count',),
+            lambda: self.get_dao().get_total_article_count()
+        )
+
+    def get_summaries_between(self, start: datetime, end: datetime, limit: int, offset: int):
+        return read_flight.do(
+            ('get_summaries_between', start, end, limit, offset),
+            lambda: self.get_dao().get_summaries_between(start, end, limit, offset)
+        )
+
+    def get_count_between(self, start: datetime, end: datetime):
+        return read_flight.do(
+            ('get_count_between', start, end),
+            lambda: self.get_dao().get_article_count_between(start, end)
+        )
+
+    def get_archive_counts(self):
+        return read_flight.do(
+            ('get_archive_counts',),
+            lambda: self.get_dao().get_archive_counts()
+        )
+
+    def get_content_version(self):
+        return self.get_dao().get_content_version()
+
+    def iter_sitemap_entries(self):
+        return self.get_dao().iter_sitemap_entries()
+
+    def get_article_fields(self, article_id: int, fields):
+        return read_flight.do(
+            ('get_article_fields', article_id, tuple(fields)),
+            lambda: self.get_dao().get_article_fields(article_id, fields)
+        )
+
+    def get_summary_page(self, fields, limit: int, cursor: str = None):
+        return read_flight.do(
+            ('get_summary_page', tuple(fields), limit, cursor),
+            lambda: self.get_dao().get_summary_page(fields, limit, cursor)
+        )
     
     def create_article(self, article: Article):
         self.get_dao().insert_article(article)
@@ -69,6 +184,16 @@ def get_service() -> Union[MockService, RealService]:
     return RealService()
 
 
+def migrate_database():
+    """Runs the idempotent schema migrations once, before a worker serves requests."""
+    lease = db_gate.shared()
+    try:
+        BlogRepository(DB_PATH).con.close()
+    finally:
+        if lease is not None:
+            lease.close()
+
+
 # --- TESTING BLOCK ---
 if __name__ == "__main__":
     print(f"--- TESTING SERVICE FACTORY (MODE: {'MOCK' if USE_MOCK_DATA else 'REAL'}) ---")
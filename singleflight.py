@@ -0,0 +1,235 @@
+"""
+Request coalescing ("single-flight") for identical concurrent reads.
+
+Within a worker, callers asking for the same key while a computation is in
+flight wait on it and share its result. Across workers, a striped flock'd lock
+file serializes the computation; only when another worker is queued for the same
+key is the result left in a pickle slot, which that worker reuses instead of
+querying the database again.
+"""
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Hashable, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process coalescing only
+    fcntl = None
+
+LOCK_STRIPES = 64    # Fixed set of lock files, shared by all keys
+SLOT_TTL = 30        # Seconds before an unread slot or stale waiter marker is swept
+SWEEP_INTERVAL = 60
+
+_MISSING = object()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    def __init__(self, shared_dir: Optional[str] = None):
+        self.shared_dir = shared_dir if fcntl is not None else None
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> _Call
+        self._next_sweep = 0.0
+        self.stats = {
+            "calls": 0,             # every do() invocation
+            "executions": 0,        # times fn actually ran (DB calls made)
+            "collapsed_local": 0,   # waited on an in-flight call in this worker
+            "collapsed_shared": 0,  # reused a result computed by another worker
+        }
+
+        if self.shared_dir:
+            os.makedirs(self.shared_dir, exist_ok=True)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            self.stats["calls"] += 1
+            call = self._calls.get(key)
+            if call is not None:
+                self.stats["collapsed_local"] += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._run_shared(key, fn) if self.shared_dir else self._run(fn)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+        stats["collapsed"] = stats["collapsed_local"] + stats["collapsed_shared"]
+        stats["pid"] = os.getpid()
+        return stats
+
+    def _run(self, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            self.stats["executions"] += 1
+        return fn()
+
+    def _run_shared(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Runs fn under a striped file lock. Uncontended calls just run fn; a
+        worker that finds the lock taken registers as a waiter, and the holder
+        then leaves its pickled result in a slot for the waiters to reuse. The
+        last waiter to read the slot deletes it.
+        """
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        stripe = int(digest[:8], 16) % LOCK_STRIPES
+        lock_path = os.path.join(self.shared_dir, f"stripe-{stripe:02d}.lock")
+        slot_path = os.path.join(self.shared_dir, f"{digest}.result")
+        waiting_dir = os.path.join(self.shared_dir, f"{digest}.waiting")
+        started = time.time()
+
+        self._maybe_sweep()
+
+        with open(lock_path, 'a') as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                marker = None
+            except BlockingIOError:
+                marker = self._register_waiter(waiting_dir)
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+            try:
+                if marker is not None:
+                    result = self._take_slot(slot_path, started)
+                    self._unregister_waiter(marker, waiting_dir, slot_path)
+                    if result is not _MISSING:
+                        with self._lock:
+                            self.stats["collapsed_shared"] += 1
+                        return result
+
+                result = self._run(fn)
+
+                # Only pay for pickling when another worker is queued for this key
+                if os.path.isdir(waiting_dir):
+                    fd, tmp_path = tempfile.mkstemp(dir=self.shared_dir, suffix='.tmp')
+                    with os.fdopen(fd, 'wb') as f:
+                        pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    os.replace(tmp_path, slot_path)
+                return result
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _register_waiter(waiting_dir: str) -> str:
+        marker = os.path.join(waiting_dir, f"{os.getpid()}-{threading.get_ident()}")
+        while True:
+            os.makedirs(waiting_dir, exist_ok=True)
+            try:
+                open(marker, 'w').close()
+                return marker
+            except FileNotFoundError:
+                continue  # The last waiter removed the directory meanwhile
+
+    @staticmethod
+    def _take_slot(slot_path: str, started: float):
+        try:
+            if os.stat(slot_path).st_mtime >= started:
+                with open(slot_path, 'rb') as f:
+                    return pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            pass
+        return _MISSING
+
+    @staticmethod
+    def _unregister_waiter(marker: str, waiting_dir: str, slot_path: str):
+        try:
+            os.remove(marker)
+            os.rmdir(waiting_dir)
+        except OSError:
+            return  # Other waiters still need the slot
+        try:
+            os.remove(slot_path)
+        except FileNotFoundError:
+            pass
+
+    def _maybe_sweep(self):
+        """Removes slots and waiter markers left behind by crashed workers."""
+        now = time.time()
+        with self._lock:
+            if now < self._next_sweep:
+                return
+            self._next_sweep = now + SWEEP_INTERVAL
+
+        for entry in os.scandir(self.shared_dir):
+            try:
+                if entry.name.endswith('.waiting'):
+                    for marker in os.scandir(entry.path):
+                        if marker.stat().st_mtime < now - SLOT_TTL:
+                            os.remove(marker.path)
+                    os.rmdir(entry.path)
+                elif entry.name.endswith(('.result', '.tmp')) and entry.stat().st_mtime < now - SLOT_TTL:
+                    os.remove(entry.path)
+            except OSError:
+                continue
+
+
+if __name__ == "__main__":
+    import multiprocessing
+    import shutil
+
+    def slow_read():
+        time.sleep(0.5)
+        return {"answer": 42}
+
+    # 1. Two threads, one worker: the second call waits on the first
+    flight = SingleFlight()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do(('q', 1), slow_read))) for _ in range(2)]
+    [t.start() for t in threads]
+    [t.join() for t in threads]
+    stats = flight.snapshot()
+    print(f"[threads] results={results} executions={stats['executions']} collapsed_local={stats['collapsed_local']}")
+    assert stats["executions"] == 1 and stats["collapsed_local"] == 1
+
+    # 2. Two processes sharing a slot directory: one runs, the other reuses its result
+    if fcntl is not None:
+        shared_dir = tempfile.mkdtemp(prefix="singleflight-")
+
+        def worker(queue):
+            flight = SingleFlight(shared_dir)
+            queue.put((flight.do(('q', 1), slow_read), flight.snapshot()))
+
+        ctx = multiprocessing.get_context('fork')  # Workers are nested functions
+        queue = ctx.Queue()
+        procs = [ctx.Process(target=worker, args=(queue,)) for _ in range(2)]
+        for p in procs:
+            p.start()
+            time.sleep(0.1)  # Make sure the second one finds the lock taken
+        outcomes = [queue.get() for _ in procs]
+        [p.join() for p in procs]
+
+        executions = sum(s["executions"] for _, s in outcomes)
+        shared = sum(s["collapsed_shared"] for _, s in outcomes)
+        leftovers = [n for n in os.listdir(shared_dir) if not n.endswith('.lock')]
+        print(f"[processes] executions={executions} collapsed_shared={shared} leftovers={leftovers}")
+        assert executions == 1 and shared == 1 and not leftovers
+        shutil.rmtree(shared_dir)
+
+    print("--- SINGLEFLIGHT CHECKS PASSED ---")